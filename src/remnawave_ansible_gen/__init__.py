@@ -1,7 +1,8 @@
 """Remnawave Ansible Module Generator."""
 
-from .cli import main
-from .models import DiscoveredEndpoint, DiscoveredResource
+from typing import Any
+
+from .models import DiscoveredEndpoint, DiscoveredResource, Field, OpType
 
 __version__ = "0.1.0"
 
@@ -10,4 +11,16 @@ __all__ = [
     "main",
     "DiscoveredEndpoint",
     "DiscoveredResource",
+    "Field",
+    "OpType",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # The CLI pulls in jinja2, PyYAML and the whole generator; only load it when
+    # asked for, so entry points like `version` start without it
+    if name == "main":
+        from .cli import main
+
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
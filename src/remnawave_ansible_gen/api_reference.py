@@ -2,25 +2,27 @@
 
 import json
 import shutil
+from dataclasses import replace
 from pathlib import Path
 from typing import Any
 
 from jinja2 import Environment
 
-from .models import DiscoveredResource
-from .schema import extract_fields_from_schema, get_schema_by_name
-from .utils import to_snake_case
+from .models import DiscoveredResource, Field, OpType
+from .rendering import get_template
+from .schema import get_schema_by_name
+from .utils import ensure_dir, to_snake_case, write_files
 
 
-def generate_example_value(field: dict[str, Any], example_values: dict[str, Any] | None = None) -> Any:
+def generate_example_value(field: Field, example_values: dict[str, Any] | None = None) -> Any:
     """Generate an example value for a field based on its metadata."""
-    snake_name = field["snake_name"]
+    snake_name = field.snake_name
 
     # Check config-provided example values first
     if example_values and snake_name in example_values:
         return example_values[snake_name]
 
-    field_type = field["type"]
+    field_type = field.type
     name_lower = snake_name.lower()
 
     if field_type == "bool":
@@ -39,19 +41,19 @@ def generate_example_value(field: dict[str, Any], example_values: dict[str, Any]
         if "bytes" in name_lower:
             return 10737418240
         if "day" in name_lower:
-            if field.get("min"):
-                return field["min"]
+            if field.min:
+                return field.min
             return 1
         # Use minimum if available
-        if field.get("min") is not None:
-            return field["min"]
+        if field.min is not None:
+            return field.min
         return 0
 
     if field_type == "str":
-        fmt = field.get("format", "")
+        fmt = field.format or ""
         if fmt == "uuid":
             return "00000000-0000-0000-0000-000000000001"
-        max_len = field.get("max_length")
+        max_len = field.max_length
         if max_len and max_len == 2:
             return "US"
         if "name" in name_lower:
@@ -63,12 +65,12 @@ def generate_example_value(field: dict[str, Any], example_values: dict[str, Any]
         return "example-value"
 
     if field_type == "list":
-        elements = field.get("elements", "str")
+        elements = field.elements or "str"
         if elements == "str":
             if "tag" in name_lower or "inbound" in name_lower:
                 fmt = ""
                 # Check if items have uuid format from nested info
-                if field.get("format") == "uuid":
+                if field.format == "uuid":
                     return ["00000000-0000-0000-0000-000000000001"]
                 return ["EXAMPLE_TAG"]
             return ["example-item"]
@@ -81,28 +83,28 @@ def generate_example_value(field: dict[str, Any], example_values: dict[str, Any]
     return "example-value"
 
 
-def build_field_comment(field: dict[str, Any]) -> str:
+def build_field_comment(field: Field) -> str:
     """Build a YAML comment string summarizing field constraints."""
     parts: list[str] = []
 
-    if field.get("required"):
+    if field.required:
         parts.append("required")
 
-    parts.append(field["type"])
-
-    if field.get("format"):
-        parts.append(f"format: {field['format']}")
-
-    if field.get("min_length") is not None:
-        parts.append(f"minLength: {field['min_length']}")
-    if field.get("max_length") is not None:
-        parts.append(f"maxLength: {field['max_length']}")
-    if field.get("min") is not None:
-        parts.append(f"min: {field['min']}")
-    if field.get("max") is not None:
-        parts.append(f"max: {field['max']}")
-    if field.get("default") is not None:
-        default_val = field["default"]
+    parts.append(field.type)
+
+    if field.format:
+        parts.append(f"format: {field.format}")
+
+    if field.min_length is not None:
+        parts.append(f"minLength: {field.min_length}")
+    if field.max_length is not None:
+        parts.append(f"maxLength: {field.max_length}")
+    if field.min is not None:
+        parts.append(f"min: {field.min}")
+    if field.max is not None:
+        parts.append(f"max: {field.max}")
+    if field.default is not None:
+        default_val = field.default
         if isinstance(default_val, bool):
             default_val = str(default_val).lower()
         parts.append(f"default: {default_val}")
@@ -218,7 +220,7 @@ def _render_field_line(
 
 
 def prepare_fields_block(
-    fields: list[dict[str, Any]],
+    fields: list[Field],
     example_values: dict[str, Any] | None,
     base_indent: int = 8,
 ) -> str:
@@ -226,10 +228,10 @@ def prepare_fields_block(
     lines: list[str] = []
 
     for field in fields:
-        snake_name = field["snake_name"]
+        snake_name = field.snake_name
         value = generate_example_value(field, example_values)
         comment = build_field_comment(field)
-        json_format = field.get("json_format", False)
+        json_format = field.json_format
         line = _render_field_line(snake_name, value, comment, base_indent, json_format=json_format)
         lines.append(line)
 
@@ -244,18 +246,14 @@ def render_api_reference(
     config: dict[str, Any],
 ) -> list[Path]:
     """Render API reference files for all resources."""
-    # Clean stale output
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
+    ensure_dir(output_dir)
 
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    generated_files: list[Path] = []
+    writes: list[tuple[Path, str]] = []
     module_overrides = config.get("module_overrides", {})
 
     for resource in resources:
         # Get the create DTO schema
-        create_endpoint = resource.endpoints.get("create")
+        create_endpoint = resource.endpoints[OpType.CREATE]
         if not create_endpoint or not create_endpoint.dto:
             continue
 
@@ -263,15 +261,16 @@ def render_api_reference(
         if not create_schema:
             continue
 
-        # Extract fields (excluding read-only)
-        fields = extract_fields_from_schema(create_schema, resource.read_only_fields)
+        # Fields (excluding read-only) were extracted during discovery;
+        # copied because they are modified below
+        fields = [replace(field) for field in resource.fields]
 
         # Apply field renames
         for field in fields:
-            original_name = field["name"]
+            original_name = field.name
             if original_name in resource.field_renames:
                 renamed = resource.field_renames[original_name]
-                field["snake_name"] = to_snake_case(renamed)
+                field.snake_name = to_snake_case(renamed)
 
         # Get example values from config
         override = module_overrides.get(resource.module_name, {})
@@ -284,7 +283,7 @@ def render_api_reference(
         fields_block = prepare_fields_block(fields, example_values)
 
         # Render template
-        template = env.get_template("api_reference/all_options.yml.j2")
+        template = get_template(env, "api_reference/all_options.yml.j2")
         content = template.render(
             resource_name=resource.resource_name,
             module_name=resource.module_name,
@@ -292,40 +291,49 @@ def render_api_reference(
         )
 
         output_path = output_dir / f"{resource.module_name}_all_options.yml"
-        output_path.write_text(content)
-        generated_files.append(output_path)
+        writes.append((output_path, content))
+
+    write_files(writes)
+    generated_files = [path for path, _ in writes]
+
+    # Clean stale output (unchanged files are kept as-is by write_files)
+    for stale_path in set(output_dir.iterdir()) - set(generated_files):
+        if stale_path.is_dir():
+            shutil.rmtree(stale_path)
+        else:
+            stale_path.unlink()
 
     return generated_files
 
 
-def _enrich_fields_from_spec(fields: list[dict[str, Any]], schema: dict[str, Any]) -> None:
+def _enrich_fields_from_spec(fields: list[Field], schema: dict[str, Any]) -> None:
     """Enrich field metadata with additional info from the raw schema."""
     properties = schema.get("properties", {})
     for field in fields:
-        prop = properties.get(field["name"], {})
+        prop = properties.get(field.name, {})
         # Freeform objects (type: object with empty or no properties) use JSON format
-        if field["type"] == "dict" and prop.get("type") == "object":
+        if field.type == "dict" and prop.get("type") == "object":
             defined_props = prop.get("properties", {})
             if not defined_props:
-                field["json_format"] = True
+                field.json_format = True
         # For arrays, check items format
-        if field["type"] == "list" and "items" in prop:
+        if field.type == "list" and "items" in prop:
             items = prop["items"]
             if items.get("format"):
-                field["format"] = items["format"]
+                field.format = items["format"]
             if items.get("pattern"):
-                field["pattern"] = items["pattern"]
+                field.pattern = items["pattern"]
             if items.get("maxLength"):
-                field["item_max_length"] = items["maxLength"]
+                field.item_max_length = items["maxLength"]
         # For arrays at field level
         if "maxItems" in prop:
-            field["max_items"] = prop["maxItems"]
+            field.max_items = prop["maxItems"]
 
 
 def list_api_reference_files(resources: list[DiscoveredResource]) -> list[str]:
     """List API reference files that would be generated (for dry-run)."""
     files = []
     for resource in resources:
-        if resource.endpoints.get("create"):
+        if resource.endpoints[OpType.CREATE]:
             files.append(f"{resource.module_name}_all_options.yml")
     return sorted(files)
@@ -2,8 +2,11 @@
 """CLI entry point for the Remnawave Ansible Module Generator."""
 
 import argparse
+import filecmp
+import os
 import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import yaml
@@ -11,8 +14,21 @@ import yaml
 from .api_reference import list_api_reference_files, render_api_reference
 from .config import load_config, load_openapi_spec
 from .discovery import discover_resources, discovered_to_module_config
-from .rendering import create_jinja_environment, format_code, render_module, render_module_utils
-from .utils import extract_api_version, read_pyproject_version
+from .models import OpType
+from .rendering import (
+    ModuleRenderTask,
+    create_jinja_environment,
+    format_code,
+    referenced_schemas,
+    render_module_task,
+    render_module_utils,
+)
+from .utils import ensure_dir, extract_api_version, read_pyproject_version, write_files
+
+# Resolved once at import instead of on every use
+_PACKAGE_DIR = Path(__file__).parent
+_PROJECT_ROOT = _PACKAGE_DIR.parent.parent
+_TEMPLATES_DIR = _PACKAGE_DIR / "templates"
 
 
 def parse_args() -> argparse.Namespace:
@@ -31,16 +47,16 @@ def main() -> int:
     args = parse_args()
 
     # Determine project root
-    project_root = Path(__file__).parent.parent.parent
+    project_root = _PROJECT_ROOT
 
     # Load configuration
-    config_path = Path(__file__).parent / "config.yaml"
+    config_path = _PACKAGE_DIR / "config.yaml"
     config = load_config(config_path)
 
     # Load OpenAPI spec
     spec_path = project_root / config["general"]["spec_file"]
     print(f"Loading OpenAPI spec from {spec_path}...")
-    spec = load_openapi_spec(spec_path)
+    spec = load_openapi_spec(spec_path, project_root / ".cache" / "spec.pkl")
 
     # Extract versions
     collection_version = read_pyproject_version(project_root)
@@ -60,8 +76,9 @@ def main() -> int:
             print(f"    base_path: {resource.base_path}")
             print(f"    id_param: {resource.id_param}")
             print(f"    lookup_field: {resource.lookup_field}")
-            print(f"    endpoints: {list(resource.endpoints.keys())}")
-            print(f"    read_only_fields: {resource.read_only_fields[:5]}...")
+            endpoint_names = [OpType(i).key for i, ep in enumerate(resource.endpoints) if ep]
+            print(f"    endpoints: {endpoint_names}")
+            print(f"    read_only_fields: {sorted(resource.read_only_fields)[:5]}...")
 
         # List API reference files that would be generated
         api_ref_dir = config.get("api_reference", {}).get(
@@ -75,50 +92,62 @@ def main() -> int:
         return 0
 
     module_configs = [discovered_to_module_config(r) for r in resources]
-    read_only_by_module = {r.module_name: r.read_only_fields for r in resources}
-    read_only_fields = config.get("read_only_fields", [])
 
     # Set up Jinja2 environment
-    templates_dir = Path(__file__).parent / "templates"
-    env = create_jinja_environment(templates_dir)
+    templates_dir = _TEMPLATES_DIR
+    bytecode_cache_dir = project_root / ".jinja_cache"
+    env = create_jinja_environment(templates_dir, bytecode_cache_dir)
 
     # Output directories
     modules_dir = project_root / config["general"]["output_dir"]
     module_utils_dir = project_root / config["general"]["module_utils_dir"]
 
     # Ensure directories exist
-    modules_dir.mkdir(parents=True, exist_ok=True)
-    module_utils_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(modules_dir)
+    ensure_dir(module_utils_dir)
 
     # Generate shared module utilities
     print("Generating module_utils/remnawave.py...")
-    utils_code = render_module_utils(env, config)
     utils_path = module_utils_dir / "remnawave.py"
-    with open(utils_path, "w") as f:
-        f.write(utils_code)
-    format_code(utils_path, project_root)
-
-    # Generate each module
-    for module_config in module_configs:
-        module_name = module_config["name"]
-        print(f"Generating {module_name}.py...")
-
-        # In discover mode, use per-resource read_only_fields
-        module_read_only = read_only_by_module.get(module_name, read_only_fields)
-
-        try:
-            module_code = render_module(env, module_config, spec, module_read_only, collection_version, api_version)
-            module_path = modules_dir / f"{module_name}.py"
-
-            with open(module_path, "w") as f:
-                f.write(module_code)
-
-            format_code(module_path, project_root)
-            print(f"  -> Generated {module_path}")
-
-        except Exception as e:
-            print(f"  -> Error generating {module_name}: {e}")
-            return 1
+    render_module_utils(env, config, utils_path)
+
+    # Generate each module in parallel; workers only receive the schemas they need
+    tasks = [
+        ModuleRenderTask(
+            templates_dir=templates_dir,
+            bytecode_cache_dir=bytecode_cache_dir,
+            module_config=module_config,
+            schemas=referenced_schemas(spec, module_config),
+            read_only_fields=frozenset(module_config["read_only_fields"]),
+            collection_version=collection_version,
+            api_version=api_version,
+            module_path=modules_dir / f"{module_config['name']}.py",
+        )
+        for module_config in module_configs
+    ]
+    # No more workers than modules to render (the pool needs at least one)
+    with ProcessPoolExecutor(max_workers=max(1, min(len(tasks), os.cpu_count() or 1))) as executor:
+        errors = list(executor.map(render_module_task, tasks))
+
+    # Report per-module status in one write
+    log_lines: list[str] = []
+    failed = False
+    for task, error in zip(tasks, errors):
+        module_name = task.module_config["name"]
+        log_lines.append(f"Generating {module_name}.py...")
+        if error is not None:
+            log_lines.append(f"  -> Error generating {module_name}: {error}")
+            failed = True
+            break
+        log_lines.append(f"  -> Generated {task.module_path}")
+    print("\n".join(log_lines))
+
+    # Format all generated Python files with one ruff run. Every task is
+    # rendered even if one fails, so the successful ones are formatted first.
+    rendered_paths = [task.module_path for task, error in zip(tasks, errors) if error is None]
+    format_code([utils_path, *rendered_paths], project_root)
+    if failed:
+        return 1
 
     # Generate API reference
     api_ref_config = config.get("api_reference", {})
@@ -128,15 +157,15 @@ def main() -> int:
     print(f"\nGenerating API reference in {api_ref_output}...")
     try:
         generated_refs = render_api_reference(env, resources, api_ref_output, spec, config)
-        for ref_path in generated_refs:
-            print(f"  -> Generated {ref_path}")
+        if generated_refs:
+            print("\n".join(f"  -> Generated {ref_path}" for ref_path in generated_refs))
     except Exception as e:
         print(f"  -> Error generating API reference: {e}")
         return 1
 
     # Generate version_info.yml manifest
     meta_dir = project_root / "ansible_collections" / "ilyagulya" / "remnawave" / "meta"
-    meta_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(meta_dir)
     version_info_path = meta_dir / "version_info.yml"
     version_info = {
         "collection_version": collection_version,
@@ -144,17 +173,21 @@ def main() -> int:
         "generator_version": collection_version,
     }
     print(f"\nGenerating {version_info_path}...")
-    with open(version_info_path, "w") as f:
-        f.write("# Auto-generated - DO NOT EDIT\n")
-        yaml.dump(version_info, f, default_flow_style=False, sort_keys=False)
+    version_info_content = "# Auto-generated - DO NOT EDIT\n" + yaml.dump(
+        version_info, default_flow_style=False, sort_keys=False
+    )
+    write_files([(version_info_path, version_info_content)])
     print(f"  -> Generated {version_info_path}")
 
     # Copy LICENSE file to collection
     license_src = project_root / "LICENSE"
     license_dst = project_root / "ansible_collections" / "ilyagulya" / "remnawave" / "LICENSE"
     if license_src.exists():
-        shutil.copy(license_src, license_dst)
-        print(f"  -> Copied {license_dst}")
+        if license_dst.exists() and filecmp.cmp(license_src, license_dst, shallow=False):
+            print(f"  -> {license_dst} is up to date")
+        else:
+            shutil.copy(license_src, license_dst)
+            print(f"  -> Copied {license_dst}")
 
     print("\nGeneration complete!")
     return 0
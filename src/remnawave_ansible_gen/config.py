@@ -1,26 +1,62 @@
 """Configuration loading for the Remnawave Ansible Module Generator."""
 
+import os
+import pickle
+import tempfile
 from pathlib import Path
 from typing import Any, cast
 
 import yaml
-from prance import ResolvingParser
+
+from .utils import ensure_dir
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 
 
 def load_config(config_path: Path) -> dict[str, Any]:
     """Load the generator configuration file."""
     with open(config_path) as f:
-        return cast(dict[str, Any], yaml.safe_load(f))
-
-
-def load_openapi_spec(spec_path: Path) -> dict[str, Any]:
-    """Load and resolve the OpenAPI specification."""
-    # Use flex backend which is more lenient with validation
-    try:
-        parser = ResolvingParser(str(spec_path), backend="flex")
-        return cast(dict[str, Any], parser.specification)
-    except Exception as e:
-        # Fall back to plain YAML loading if flex fails
-        print(f"Warning: ResolvingParser failed ({e}), falling back to plain YAML loading")
-        with open(spec_path) as f:
-            return cast(dict[str, Any], yaml.safe_load(f))
+        return cast(dict[str, Any], yaml.load(f, Loader=_YamlLoader))
+
+
+def load_openapi_spec(spec_path: Path, cache_path: Path | None = None) -> dict[str, Any]:
+    """Load the OpenAPI specification.
+
+    $refs are left in place and resolved on demand (see schema.resolve_ref).
+
+    Args:
+        spec_path: Path to the OpenAPI YAML file.
+        cache_path: If provided, the parsed spec is pickled there and reused
+                    while the spec file's mtime and size are unchanged.
+    """
+    st = spec_path.stat()
+    cache_key = (str(spec_path), st.st_mtime_ns, st.st_size)
+
+    if cache_path and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cached_key, cached_spec = pickle.load(f)
+            if cached_key == cache_key:
+                return cast(dict[str, Any], cached_spec)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass  # Unreadable cache, reparse below
+
+    spec = cast(dict[str, Any], yaml.load(spec_path.read_text(), Loader=_YamlLoader))
+
+    if cache_path:
+        # Best effort: a read-only checkout or a concurrent run must not fail the load
+        tmp_name = None
+        try:
+            ensure_dir(cache_path.parent)
+            with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix=".tmp", delete=False) as f:
+                tmp_name = f.name
+                pickle.dump((cache_key, spec), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, cache_path)
+        except OSError:
+            if tmp_name:
+                Path(tmp_name).unlink(missing_ok=True)
+
+    return spec
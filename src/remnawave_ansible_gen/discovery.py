@@ -1,14 +1,23 @@
 """Auto-discovery engine for the Remnawave Ansible Module Generator."""
 
 import re
+import sys
+from collections.abc import Callable, Collection
+from itertools import chain
 from typing import Any
 
-from .models import DiscoveredEndpoint, DiscoveredResource
-from .schema import get_schema_by_name
+from .models import DiscoveredEndpoint, DiscoveredResource, Field, OpType
+from .schema import extract_fields_from_schema, get_schema_by_name
 from .utils import to_snake_case
 
+# Prefix of $ref values that point at a named DTO schema
+_SCHEMA_REF_PREFIX = "#/components/schemas/"
 
-def classify_operation(method: str, path: str, operation: dict[str, Any]) -> str | None:
+# String constraints that mark a Create DTO field as a lookup candidate
+_CONSTRAINT_KEYS = frozenset({"minLength", "maxLength", "pattern"})
+
+
+def classify_operation(method: str, path: str, operation: dict[str, Any]) -> OpType | None:
     """
     Classify an operation as create/update/get_all/get_one/delete.
 
@@ -17,26 +26,14 @@ def classify_operation(method: str, path: str, operation: dict[str, Any]) -> str
     method = method.lower()
     operation_id = operation.get("operationId", "").lower()
 
-    # Check for path parameters and count path segments
+    # Check for path parameters
     has_path_param = "{" in path
-    path_segments = [s for s in path.split("/") if s]
 
     # Detect if path has extra segments beyond base + optional id param
     # e.g., /api/nodes = base, /api/nodes/{uuid} = base + id
     # but /api/nodes/{uuid}/restart = extra action, not CRUD
-    base_segment_count = 2  # e.g., ['api', 'nodes']
-
-    if has_path_param:
-        # Count non-param segments after base
-        extra_segments = [s for s in path_segments[base_segment_count:] if not s.startswith("{")]
-        if extra_segments:
-            # Has extra path segments after id param, skip (e.g., /computed-config)
-            return None
-    else:
-        # For non-param paths, check if there are extra segments
-        if len(path_segments) > base_segment_count:
-            # Extra segments like /api/config-profiles/inbounds - skip
-            return None
+    if _has_extra_segments(path, has_path_param):
+        return None
 
     # Extract method name from operationId (e.g., "Controller_createNode" -> "createnode")
     # Also handle simple operationIds like "createNode"
@@ -45,46 +42,101 @@ def classify_operation(method: str, path: str, operation: dict[str, Any]) -> str
     if method == "post" and not has_path_param:
         # POST to base path = create
         if "create" in method_name:
-            return "create"
+            return OpType.CREATE
     elif method == "get":
         if has_path_param:
             # GET with path param = get_one
             # Match patterns: getOne*, get*ByUuid, get*By{Id}
             if "getone" in method_name or "byuuid" in method_name or "byname" in method_name:
-                return "get_one"
+                return OpType.GET_ONE
         else:
             # GET to base path without param = get_all
             # Match patterns: getAll*, get{Resources} (plural)
             # Avoid sub-resource patterns
             if "getall" in method_name:
-                return "get_all"
+                return OpType.GET_ALL
             # Also match "get{Resource}s" pattern (e.g., getConfigProfiles, getNodes)
             if method_name.startswith("get") and not any(
                 x in method_name for x in ["tags", "inbound", "stats", "settings"]
             ):
-                return "get_all"
+                return OpType.GET_ALL
     elif method == "patch" and not has_path_param:
         # PATCH to base path = update
         if "update" in method_name:
-            return "update"
+            return OpType.UPDATE
     elif method == "delete" and has_path_param:
         # DELETE with path param = delete
         if "delete" in method_name:
-            return "delete"
+            return OpType.DELETE
 
     return None
 
 
+def _has_extra_segments(path: str, has_path_param: bool) -> bool:
+    """
+    Check whether a path has non-param segments beyond the base path.
+
+    Scans the path in place instead of splitting it into a segment list.
+    """
+    base_segment_count = 2  # e.g., /api/nodes
+    segment_index = 0
+    pos = 0
+    end = len(path)
+
+    while pos < end:
+        next_slash = path.find("/", pos)
+        if next_slash == -1:
+            next_slash = end
+        if next_slash > pos:
+            # After the base, only {param} segments are allowed
+            if segment_index >= base_segment_count and not (has_path_param and path[pos] == "{"):
+                return True
+            segment_index += 1
+        pos = next_slash + 1
+
+    return False
+
+
 def extract_dto_from_ref(ref: str | None) -> str | None:
     """Extract DTO name from $ref string."""
     if not ref:
         return None
     # $ref: "#/components/schemas/CreateNodeRequestDto"
-    if ref.startswith("#/components/schemas/"):
-        return ref.split("/")[-1]
+    if ref.startswith(_SCHEMA_REF_PREFIX):
+        return sys.intern(ref.rsplit("/", 1)[-1])
     return None
 
 
+def preresolve_refs(spec: dict[str, Any]) -> dict[int, str]:
+    """
+    Map every schema $ref node in the spec to its DTO name.
+
+    Walks the spec once and returns {id(node): name} for each node with a
+    "#/components/schemas/..." $ref, so discovery can look the name up
+    directly instead of parsing the ref per operation. The spec itself is
+    not modified; the ids are only valid while the spec is alive.
+    """
+    dto_names: dict[int, str] = {}
+    stack: list[Any] = [spec]
+    seen: set[int] = set()
+
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        if isinstance(node, dict):
+            seen.add(id(node))
+            dto = extract_dto_from_ref(node.get("$ref"))
+            if dto:
+                dto_names[id(node)] = dto
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            seen.add(id(node))
+            stack.extend(node)
+
+    return dto_names
+
+
 def detect_id_param(path: str) -> str | None:
     """Detect the id parameter from a path with placeholder."""
     # Extract {uuid} or {name} from path like /api/nodes/{uuid}
@@ -105,16 +157,15 @@ def detect_lookup_field(create_schema: dict[str, Any]) -> str | None:
     required_fields = set(create_schema.get("required", []))
 
     # Prioritize 'name' if it exists and is required
-    if "name" in properties and "name" in required_fields:
-        prop = properties["name"]
-        if prop.get("type") == "string":
-            return "name"
+    name_prop = properties.get("name")
+    if name_prop is not None and "name" in required_fields and name_prop.get("type") == "string":
+        return "name"
 
     # Otherwise, find the first constrained string field
     for name, prop in properties.items():
         if name in required_fields and prop.get("type") == "string":
             # Check for constraints
-            if any(k in prop for k in ["minLength", "maxLength", "pattern"]):
+            if not _CONSTRAINT_KEYS.isdisjoint(prop):
                 return name
 
     return None
@@ -129,7 +180,7 @@ def compute_read_only_fields(
 
     These are read-only fields that should be excluded from idempotency checks.
     """
-    create_fields = set(create_schema.get("properties", {}).keys())
+    create_fields = create_schema.get("properties", {}).keys()
 
     # Response is typically wrapped in a 'response' property
     response_props = response_schema.get("properties", {})
@@ -141,7 +192,29 @@ def compute_read_only_fields(
 
     # Read-only fields are in response but not in create
     read_only = response_fields - create_fields
-    return sorted(read_only)
+    return list(read_only)
+
+
+def analyze_schemas(
+    spec: dict[str, Any],
+    create_schema: dict[str, Any],
+    response_schema: dict[str, Any] | None,
+    read_only_fields: Collection[str],
+) -> tuple[list[Field], set[str]]:
+    """
+    Extract module fields and the full read-only field list in one pass.
+
+    The read-only fields are read_only_fields plus the response-only fields.
+    Fields are extracted from the create DTO excluding them, so the create DTO
+    properties are only walked once per resource.
+
+    Returns a (fields, read_only_fields) tuple.
+    """
+    read_only = set(read_only_fields)
+    if response_schema:
+        read_only.update(compute_read_only_fields(create_schema, response_schema))
+
+    return extract_fields_from_schema(spec, create_schema, read_only), read_only
 
 
 def derive_resource_name_from_tag(tag: str) -> str:
@@ -171,10 +244,12 @@ def derive_module_name_from_resource(resource_name: str) -> str:
 
 def group_operations_by_controller(
     spec: dict[str, Any],
+    tag_filter: Callable[[str], bool] | None = None,
 ) -> dict[str, list[tuple[str, str, dict[str, Any]]]]:
     """
     Group operations by controller tag.
 
+    If tag_filter is given, tags it rejects are skipped entirely.
     Returns a dict mapping tag -> list of (path, method, operation).
     """
     controllers: dict[str, list[tuple[str, str, dict[str, Any]]]] = {}
@@ -184,8 +259,11 @@ def group_operations_by_controller(
             if method not in path_item:
                 continue
             operation = path_item[method]
-            tags = operation.get("tags", [])
-            for tag in tags:
+            for tag in operation.get("tags", ()):
+                if tag_filter and not tag_filter(tag):
+                    continue
+                # Tags recur across many operations; share one string object per tag
+                tag = sys.intern(tag)
                 if tag not in controllers:
                     controllers[tag] = []
                 controllers[tag].append((path, method.upper(), operation))
@@ -208,24 +286,23 @@ def discover_resources(
     module_overrides = config.get("module_overrides", {})
     global_read_only = config.get("read_only_fields", [])
 
-    controllers = group_operations_by_controller(spec)
+    def keep(tag: str) -> bool:
+        # Apply include/exclude filters
+        return (not include_controllers or tag in include_controllers) and tag not in exclude_controllers
+
+    dto_names = preresolve_refs(spec)
+    controllers = group_operations_by_controller(spec, tag_filter=keep)
     resources: list[DiscoveredResource] = []
 
     for tag, operations in controllers.items():
-        # Apply include/exclude filters
-        if include_controllers and tag not in include_controllers:
-            continue
-        if tag in exclude_controllers:
-            continue
-
         # Classify operations
-        endpoints: dict[str, DiscoveredEndpoint] = {}
+        endpoints: list[DiscoveredEndpoint | None] = [None] * len(OpType)
         base_path: str | None = None
         id_param: str | None = None
 
         for path, method, operation in operations:
             op_type = classify_operation(method, path, operation)
-            if not op_type:
+            if op_type is None:
                 continue
 
             # Extract DTO references
@@ -236,16 +313,14 @@ def discover_resources(
             request_body = operation.get("requestBody", {})
             content = request_body.get("content", {}).get("application/json", {})
             schema = content.get("schema", {})
-            dto = extract_dto_from_ref(schema.get("$ref"))
+            dto = dto_names.get(id(schema))
 
             # Response DTO
             responses = operation.get("responses", {})
-            for status in ["200", "201"]:
-                if status in responses:
-                    resp_content = responses[status].get("content", {})
-                    resp_schema = resp_content.get("application/json", {}).get("schema", {})
-                    response_dto = extract_dto_from_ref(resp_schema.get("$ref"))
-                    break
+            resp = responses.get("200") or responses.get("201")
+            if resp:
+                resp_schema = resp.get("content", {}).get("application/json", {}).get("schema", {})
+                response_dto = dto_names.get(id(resp_schema))
 
             endpoints[op_type] = DiscoveredEndpoint(
                 path=path,
@@ -255,13 +330,14 @@ def discover_resources(
             )
 
             # Detect base path and id_param
-            if op_type == "create":
+            if op_type == OpType.CREATE:
                 base_path = path
-            elif op_type in ("get_one", "delete") and "{" in path:
+            elif op_type in (OpType.GET_ONE, OpType.DELETE) and "{" in path:
                 id_param = detect_id_param(path)
 
         # Skip if we don't have at least create and get_all
-        if "create" not in endpoints or "get_all" not in endpoints:
+        create_endpoint = endpoints[OpType.CREATE]
+        if create_endpoint is None or endpoints[OpType.GET_ALL] is None:
             continue
 
         # Derive resource and module names
@@ -269,7 +345,7 @@ def discover_resources(
         module_name = derive_module_name_from_resource(resource_name)
 
         # Get create DTO schema for field detection
-        create_dto_name = endpoints["create"].dto
+        create_dto_name = create_endpoint.dto
         if not create_dto_name:
             continue
 
@@ -282,13 +358,8 @@ def discover_resources(
         if not lookup_field:
             lookup_field = "name"  # Default fallback
 
-        # Compute read-only fields
-        response_dto_name = endpoints["create"].response_dto
-        resource_read_only: list[str] = []
-        if response_dto_name:
-            response_schema = get_schema_by_name(spec, response_dto_name)
-            if response_schema:
-                resource_read_only = compute_read_only_fields(create_schema, response_schema)
+        response_dto_name = create_endpoint.response_dto
+        response_schema = get_schema_by_name(spec, response_dto_name) if response_dto_name else None
 
         # Build resource
         resource = DiscoveredResource(
@@ -298,13 +369,17 @@ def discover_resources(
             base_path=base_path or "",
             id_param=id_param or "uuid",
             lookup_field=lookup_field,
-            endpoints=endpoints,
-            read_only_fields=resource_read_only,
+            endpoints=tuple(endpoints),
         )
 
         # Apply overrides
         resource = apply_overrides(resource, module_overrides, global_read_only)
 
+        # Extract fields and add response-only fields to read-only fields
+        resource.fields, resource.read_only_fields = analyze_schemas(
+            spec, create_schema, response_schema, resource.read_only_fields
+        )
+
         resources.append(resource)
 
     return resources
@@ -319,12 +394,10 @@ def apply_overrides(
     module_override = overrides.get(resource.module_name, {})
 
     # Merge read-only fields: global + discovered + override
-    all_read_only = set(global_read_only)
-    all_read_only.update(resource.read_only_fields)
-    if "read_only_fields" in module_override:
-        all_read_only.update(module_override["read_only_fields"])
-
-    resource.read_only_fields = sorted(all_read_only)
+    # (kept as a set; sorted once in discovered_to_module_config)
+    resource.read_only_fields = set(
+        chain(global_read_only, resource.read_only_fields, module_override.get("read_only_fields", ()))
+    )
 
     # Apply other overrides
     if "lookup_field" in module_override:
@@ -344,7 +417,9 @@ def apply_overrides(
 def discovered_to_module_config(resource: DiscoveredResource) -> dict[str, Any]:
     """Convert a DiscoveredResource to the legacy module config format."""
     endpoints = {}
-    for op_type, endpoint in resource.endpoints.items():
+    for op_index, endpoint in enumerate(resource.endpoints):
+        if endpoint is None:
+            continue
         ep_config: dict[str, Any] = {
             "path": endpoint.path,
             "method": endpoint.method,
@@ -353,7 +428,7 @@ def discovered_to_module_config(resource: DiscoveredResource) -> dict[str, Any]:
             ep_config["dto"] = endpoint.dto
         if endpoint.response_dto:
             ep_config["response_dto"] = endpoint.response_dto
-        endpoints[op_type] = ep_config
+        endpoints[OpType(op_index).key] = ep_config
 
     # Use description override if available, otherwise generate
     if resource.description:
@@ -378,6 +453,8 @@ def discovered_to_module_config(resource: DiscoveredResource) -> dict[str, Any]:
         "id_param": resource.id_param,
         "lookup_field": resource.lookup_field,
         "endpoints": endpoints,
+        "fields": resource.fields,
+        "read_only_fields": sorted(resource.read_only_fields),
         "resolve_uuid_by_name": resource.resolve_uuid_by_name,
         "field_renames": resource.field_renames,
     }
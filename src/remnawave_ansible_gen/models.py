@@ -1,10 +1,50 @@
 """Data models for the Remnawave Ansible Module Generator."""
 
 from dataclasses import dataclass, field
+from enum import IntEnum
 from typing import Any
 
 
-@dataclass
+class OpType(IntEnum):
+    """CRUD operation type, used as an index into DiscoveredResource.endpoints."""
+
+    CREATE = 0
+    GET_ALL = 1
+    GET_ONE = 2
+    UPDATE = 3
+    DELETE = 4
+
+    @property
+    def key(self) -> str:
+        """Name used in the module config (e.g. "get_all")."""
+        return self.name.lower()
+
+
+@dataclass(slots=True)
+class Field:
+    """Module option extracted from a DTO property."""
+
+    name: str  # API name, e.g. "countryCode"
+    snake_name: str  # Option name, e.g. "country_code"
+    type: str  # Ansible argument spec type
+    required: bool
+    description: str
+    default: Any = None
+    nested_fields: list["Field"] | None = None
+    elements: str | None = None  # Element type of list fields
+    format: str | None = None
+    min: Any = None
+    max: Any = None
+    min_length: int | None = None
+    max_length: int | None = None
+    # Set by the API reference generator from the raw schema
+    pattern: str | None = None
+    item_max_length: int | None = None
+    max_items: int | None = None
+    json_format: bool = False  # Render freeform dicts (e.g. Xray config) as JSON
+
+
+@dataclass(slots=True, frozen=True)
 class DiscoveredEndpoint:
     """Discovered endpoint configuration."""
 
@@ -14,7 +54,7 @@ class DiscoveredEndpoint:
     response_dto: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DiscoveredResource:
     """Auto-discovered resource from OpenAPI spec."""
 
@@ -25,8 +65,8 @@ class DiscoveredResource:
     id_param: str  # "uuid" or "name"
     lookup_field: str  # "name"
     description: str | None = None  # Override from config
-    endpoints: dict[str, DiscoveredEndpoint] = field(default_factory=dict)
-    fields: list[dict[str, Any]] = field(default_factory=list)
-    read_only_fields: list[str] = field(default_factory=list)
+    endpoints: tuple[DiscoveredEndpoint | None, ...] = (None,) * len(OpType)  # Indexed by OpType
+    fields: list[Field] = field(default_factory=list)
+    read_only_fields: list[str] | set[str] = field(default_factory=list)
     resolve_uuid_by_name: bool = False  # Enable config profile name resolution
     field_renames: dict[str, str] = field(default_factory=dict)  # API field name -> user-friendly name
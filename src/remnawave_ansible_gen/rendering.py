@@ -1,52 +1,182 @@
 """Template rendering for the Remnawave Ansible Module Generator."""
 
+import os
+import shutil
 import subprocess
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 
+from .models import Field
 from .schema import extract_fields_from_schema, get_schema_by_name
-from .utils import to_camel_case, to_snake_case
+from .utils import ensure_dir, to_camel_case, to_snake_case
 
+# Compiled templates, reused across resources and repeated renders
+_TEMPLATE_CACHE: dict[tuple[Environment, str], Template] = {}
+
+
+def create_jinja_environment(templates_dir: Path, bytecode_cache_dir: Path | None = None) -> Environment:
+    """Create and configure a Jinja2 environment.
+
+    Args:
+        templates_dir: Directory containing the Jinja2 templates.
+        bytecode_cache_dir: If provided, compiled templates are cached there
+                            so later generator runs skip template parsing.
+    """
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        ensure_dir(bytecode_cache_dir)
+        bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
 
-def create_jinja_environment(templates_dir: Path) -> Environment:
-    """Create and configure a Jinja2 environment."""
     return Environment(
         loader=FileSystemLoader(templates_dir),
         trim_blocks=True,
         lstrip_blocks=True,
         keep_trailing_newline=True,
+        auto_reload=False,
+        cache_size=400,
+        bytecode_cache=bytecode_cache,
     )
 
 
+def get_template(env: Environment, name: str) -> Template:
+    """Get a compiled template, loading it only once per environment."""
+    key = (env, name)
+    template = _TEMPLATE_CACHE.get(key)
+    if template is None:
+        template = _TEMPLATE_CACHE[key] = env.get_template(name)
+    return template
+
+
+def stream_template(template: Template, output_path: Path, **context: Any) -> None:
+    """Render a template straight into a UTF-8 file, chunk by chunk.
+
+    Used for outputs that ruff reformats anyway, where comparing against the
+    existing file (as write_files does) would never skip a write. The output is
+    rendered into a sibling temp file and moved into place only once rendering
+    succeeds, so a template error leaves the previous file intact.
+    """
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            template.stream(**context).dump(f, encoding="utf-8")
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@dataclass(frozen=True)
+class ModuleRenderTask:
+    """Everything a worker process needs to render and write one module."""
+
+    templates_dir: Path
+    bytecode_cache_dir: Path | None
+    module_config: dict[str, Any]
+    schemas: dict[str, Any]  # Only the schemas referenced by the module's endpoints
+    read_only_fields: frozenset[str]
+    collection_version: str
+    api_version: str
+    module_path: Path
+
+
+# Prefix of $ref values that point at a named schema
+_SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+# Per-process Jinja2 environments, reused across tasks handled by the same worker
+_WORKER_ENVIRONMENTS: dict[Path, Environment] = {}
+
+
+def referenced_schemas(spec: dict[str, Any], module_config: dict[str, Any]) -> dict[str, Any]:
+    """Collect the schemas referenced by a module's endpoints.
+
+    Schemas reached through $refs inside them are included too, so that field
+    extraction in a worker can resolve property and item refs.
+    """
+    schemas: dict[str, Any] = {}
+    for endpoint in module_config["endpoints"].values():
+        for key in ("dto", "response_dto"):
+            name = endpoint.get(key)
+            if name and name not in schemas:
+                schema = get_schema_by_name(spec, name)
+                if schema is not None:
+                    schemas[name] = schema
+
+    # Pull in everything the collected schemas refer to, by raw name
+    all_schemas = spec.get("components", {}).get("schemas", {})
+    stack: list[Any] = list(schemas.values())
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith(_SCHEMA_REF_PREFIX):
+                name = ref[len(_SCHEMA_REF_PREFIX) :]
+                if name not in schemas and name in all_schemas:
+                    schemas[name] = all_schemas[name]
+                    stack.append(all_schemas[name])
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return schemas
+
+
+def render_module_task(task: ModuleRenderTask) -> str | None:
+    """Render and write a single module.
+
+    Runs in a worker process. Formatting is done afterwards for all modules at once.
+    Returns an error message on failure, None on success.
+    """
+    try:
+        env = _WORKER_ENVIRONMENTS.get(task.templates_dir)
+        if env is None:
+            env = _WORKER_ENVIRONMENTS[task.templates_dir] = create_jinja_environment(
+                task.templates_dir, task.bytecode_cache_dir
+            )
+
+        spec = {"components": {"schemas": task.schemas}}
+        render_module(
+            env,
+            task.module_config,
+            spec,
+            task.read_only_fields,
+            task.collection_version,
+            task.api_version,
+            task.module_path,
+        )
+    except Exception as e:
+        return str(e)
+    return None
+
+
 def render_module(
     env: Environment,
     module_config: dict[str, Any],
     spec: dict[str, Any],
-    read_only_fields: list[str],
+    read_only_fields: Collection[str],
     collection_version: str,
     api_version: str,
-) -> str:
-    """Render an Ansible module from the template."""
-    template = env.get_template("module.py.j2")
+    output_path: Path,
+) -> None:
+    """Render an Ansible module from the template into output_path."""
+    template = get_template(env, "module.py.j2")
 
-    # Extract fields from create DTO
+    # Create DTO fields are extracted during discovery
     create_dto_name = module_config["endpoints"]["create"]["dto"]
-    create_schema = get_schema_by_name(spec, create_dto_name)
-
-    if not create_schema:
-        raise ValueError(f"Schema {create_dto_name} not found in OpenAPI spec")
-
-    fields = extract_fields_from_schema(create_schema, read_only_fields)
+    fields = module_config["fields"]
 
-    # Get update DTO if different
+    # Get update DTO if different. Names are compared first, then the resolved
+    # schemas, since a $ref alias can point both names at the same schema.
     update_dto_name = module_config["endpoints"]["update"].get("dto")
-    update_fields = []
+    update_fields: list[Field] = []
     if update_dto_name and update_dto_name != create_dto_name:
         update_schema = get_schema_by_name(spec, update_dto_name)
-        if update_schema:
-            update_fields = extract_fields_from_schema(update_schema, read_only_fields)
+        if update_schema and update_schema is not get_schema_by_name(spec, create_dto_name):
+            update_fields = extract_fields_from_schema(spec, update_schema, read_only_fields)
 
     # Convert declarative field_renames to runtime aliases
     # field_renames: {original_snake: renamed_snake}
@@ -57,66 +187,93 @@ def render_module(
         for original_snake, renamed_snake in field_renames.items()
     }
 
-    return str(
-        template.render(
-            module_name=module_config["name"],
-            resource_name=module_config["resource_name"],
-            description=module_config.get("description", f"Manage {module_config['resource_name']} resources"),
-            id_param=module_config["id_param"],
-            lookup_field=module_config["lookup_field"],
-            endpoints=module_config["endpoints"],
-            fields=fields,
-            update_fields=update_fields if update_fields else fields,
-            read_only_fields=read_only_fields,
-            field_aliases=field_aliases,
-            resolve_uuid_by_name=module_config.get("resolve_uuid_by_name", False),
-            collection_version=collection_version,
-            api_version=api_version,
-            to_snake_case=to_snake_case,
-            to_camel_case=to_camel_case,
-        )
+    stream_template(
+        template,
+        output_path,
+        module_name=module_config["name"],
+        resource_name=module_config["resource_name"],
+        description=module_config.get("description", f"Manage {module_config['resource_name']} resources"),
+        id_param=module_config["id_param"],
+        lookup_field=module_config["lookup_field"],
+        endpoints=module_config["endpoints"],
+        fields=fields,
+        update_fields=update_fields if update_fields else fields,
+        read_only_fields=read_only_fields,
+        field_aliases=field_aliases,
+        resolve_uuid_by_name=module_config.get("resolve_uuid_by_name", False),
+        collection_version=collection_version,
+        api_version=api_version,
+        to_snake_case=to_snake_case,
+        to_camel_case=to_camel_case,
     )
 
 
-def render_module_utils(env: Environment, config: dict[str, Any]) -> str:
-    """Render the shared module utilities."""
-    template = env.get_template("module_utils.py.j2")
-    return str(
-        template.render(
-            read_only_fields=config.get("read_only_fields", []),
-        )
+def render_module_utils(env: Environment, config: dict[str, Any], output_path: Path) -> None:
+    """Render the shared module utilities into output_path."""
+    template = get_template(env, "module_utils.py.j2")
+    stream_template(
+        template,
+        output_path,
+        read_only_fields=config.get("read_only_fields", []),
     )
 
 
-def format_code(file_path: Path, project_root: Path | None = None) -> None:
+@lru_cache(maxsize=1)
+def _ruff_command() -> list[str] | None:
+    """Resolve the ruff command once per process.
+
+    Prefers a ruff binary on PATH; falls back to running it through uvx.
+    """
+    ruff = shutil.which("ruff")
+    if ruff:
+        return [ruff]
+    uvx = shutil.which("uvx")
+    if uvx:
+        return [uvx, "ruff"]
+    return None
+
+
+def format_code(file_paths: Sequence[Path], project_root: Path | None = None) -> None:
     """Format Python code using ruff.
 
+    All files are passed to a single ruff invocation per step, so ruff starts
+    twice regardless of how many files were generated.
+
     Args:
-        file_path: Path to the file to format.
+        file_paths: Paths of the files to format.
         project_root: Project root directory. If provided, ruff runs from there
                       so pyproject.toml config (like per-file-ignores) is picked up.
     """
-    # Determine working directory and file path for ruff
-    if project_root:
-        cwd = str(project_root)
-        # Use relative path so per-file-ignores patterns match
-        try:
-            target = str(file_path.relative_to(project_root))
-        except ValueError:
-            target = str(file_path)
-    else:
-        cwd = None
-        target = str(file_path)
+    if not file_paths:
+        return
+
+    # Determine working directory and file paths for ruff
+    cwd = str(project_root) if project_root else None
+    targets: list[str] = []
+    for file_path in file_paths:
+        if project_root:
+            # Use relative path so per-file-ignores patterns match
+            try:
+                targets.append(str(file_path.relative_to(project_root)))
+                continue
+            except ValueError:
+                pass
+        targets.append(str(file_path))
+
+    ruff = _ruff_command()
+    if ruff is None:
+        print("Warning: ruff not found, skipping formatting")
+        return
 
     try:
         subprocess.run(
-            ["ruff", "format", target],
+            [*ruff, "format", *targets],
             check=True,
             capture_output=True,
             cwd=cwd,
         )
         subprocess.run(
-            ["ruff", "check", "--fix", target],
+            [*ruff, "check", "--fix", *targets],
             check=True,
             capture_output=True,
             cwd=cwd,
@@ -125,6 +282,6 @@ def format_code(file_path: Path, project_root: Path | None = None) -> None:
         # Show stderr if present, otherwise stdout (ruff outputs errors to stdout)
         error_output = e.stderr.decode() if e.stderr else e.stdout.decode() if e.stdout else ""
         if error_output:
-            print(f"Warning: ruff formatting failed for {file_path}: {error_output}")
+            print(f"Warning: ruff formatting failed for {', '.join(targets)}: {error_output}")
     except FileNotFoundError:
         print("Warning: ruff not found, skipping formatting")
@@ -1,65 +1,145 @@
 """OpenAPI schema extraction for the Remnawave Ansible Module Generator."""
 
+from collections.abc import Collection
 from typing import Any, cast
 
+from .models import Field
 from .utils import map_openapi_type, to_snake_case
 
+# Resolved $ref targets keyed by (id(spec), ref); the spec is stored like in _FIELDS_CACHE
+_REF_CACHE: dict[tuple[int, str], tuple[dict[str, Any], Any]] = {}
+
+# Extracted fields keyed by (id(schema), read-only fields). The schema itself is
+# stored alongside the result so its id cannot be reused while it is cached.
+_FIELDS_CACHE: dict[tuple[int, frozenset[str]], tuple[dict[str, Any], list[Field]]] = {}
+
+
+def resolve_ref(spec: dict[str, Any], ref: str) -> Any:
+    """Resolve a local $ref (e.g. "#/components/schemas/NodeDto") against the spec.
+
+    Returns None if the ref is not local or does not point at anything.
+    """
+    key = (id(spec), ref)
+    cached = _REF_CACHE.get(key)
+    if cached is not None and cached[0] is spec:
+        return cached[1]
+
+    if not ref.startswith("#/"):
+        return None
+
+    node: Any = spec
+    for part in ref[2:].split("/"):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+
+    _REF_CACHE[key] = (spec, node)
+    return node
+
+
+def _follow_refs(spec: dict[str, Any], node: Any) -> Any:
+    """Follow a chain of $refs starting at node; stops on cycles or unresolvable refs."""
+    seen: set[str] = set()
+    while isinstance(node, dict) and "$ref" in node and node["$ref"] not in seen:
+        seen.add(node["$ref"])
+        node = resolve_ref(spec, node["$ref"])
+    return node
+
 
 def get_schema_by_name(spec: dict[str, Any], schema_name: str) -> dict[str, Any] | None:
-    """Get a schema by name from the OpenAPI spec."""
+    """Get a schema by name from the OpenAPI spec, following $ref aliases."""
     schemas: dict[str, Any] = spec.get("components", {}).get("schemas", {})
-    return cast(dict[str, Any] | None, schemas.get(schema_name))
+    return cast(dict[str, Any] | None, _follow_refs(spec, schemas.get(schema_name)))
+
+
+def _resolve_property(spec: dict[str, Any], prop: dict[str, Any]) -> dict[str, Any]:
+    """Resolve a {"$ref": ...} property or items node; sibling keys override the target."""
+    target = _follow_refs(spec, prop)
+    if not isinstance(target, dict) or "$ref" in target:
+        return prop  # Unresolvable, leave it as it was
+    if len(prop) == 1:
+        return target
+    return {**target, **{key: value for key, value in prop.items() if key != "$ref"}}
+
+
+def _cached_fields(schema: dict[str, Any], read_only: frozenset[str]) -> list[Field] | None:
+    cached = _FIELDS_CACHE.get((id(schema), read_only))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    return None
+
+
+def _new_fields(schema: dict[str, Any], read_only: frozenset[str]) -> list[Field]:
+    fields: list[Field] = []
+    _FIELDS_CACHE[(id(schema), read_only)] = (schema, fields)
+    return fields
 
 
 def extract_fields_from_schema(
+    spec: dict[str, Any],
     schema: dict[str, Any],
-    read_only_fields: list[str],
-) -> list[dict[str, Any]]:
-    """Extract fields from an OpenAPI schema definition."""
-    fields = []
-    properties = schema.get("properties", {})
-    required_fields = set(schema.get("required", []))
-
-    for name, prop in properties.items():
-        if name in read_only_fields:
-            continue
-
-        field = {
-            "name": name,
-            "snake_name": to_snake_case(name),
-            "type": map_openapi_type(prop.get("type", "string"), prop.get("format")),
-            "required": name in required_fields,
-            "description": prop.get("description", f"The {name} field"),
-            "default": prop.get("default"),
-        }
-
-        # Handle nested objects
-        if prop.get("type") == "object" and "properties" in prop:
-            field["nested_fields"] = extract_fields_from_schema(prop, read_only_fields)
-
-        # Handle arrays with items
-        if prop.get("type") == "array" and "items" in prop:
-            items = prop["items"]
-            field["elements"] = map_openapi_type(items.get("type", "string"))
-
-        # Handle nullable
-        if prop.get("nullable"):
-            field["required"] = False
-
-        # Handle format for documentation
-        if prop.get("format"):
-            field["format"] = prop["format"]
-
-        # Handle min/max constraints
-        if "minimum" in prop:
-            field["min"] = prop["minimum"]
-        if "maximum" in prop:
-            field["max"] = prop["maximum"]
-        if "minLength" in prop:
-            field["min_length"] = prop["minLength"]
-        if "maxLength" in prop:
-            field["max_length"] = prop["maxLength"]
-
-        fields.append(field)
+    read_only_fields: Collection[str],
+) -> list[Field]:
+    """Extract fields from an OpenAPI schema definition.
+
+    Property and array item $refs are resolved against spec on demand. Results
+    are cached per schema and read-only field set. The returned list is shared
+    between callers and must be treated as read-only.
+    """
+    read_only = frozenset(read_only_fields)
+    fields = _cached_fields(schema, read_only)
+    if fields is not None:
+        return fields
+
+    # Nested object schemas are filled from a worklist rather than by recursion;
+    # each list is cached as soon as it is created, so repeats are shared.
+    fields = _new_fields(schema, read_only)
+    stack = [(schema, fields)]
+
+    while stack:
+        current, out = stack.pop()
+        properties = current.get("properties", {})
+        required_fields = set(current.get("required", []))
+
+        for name, prop in properties.items():
+            if name in read_only:
+                continue
+            if "$ref" in prop:
+                prop = _resolve_property(spec, prop)
+
+            pget = prop.get
+            ptype = pget("type")
+            pformat = pget("format")
+
+            field = Field(
+                name=name,
+                snake_name=to_snake_case(name),
+                type=map_openapi_type(ptype or "string", pformat),
+                required=name in required_fields and not pget("nullable"),
+                description=pget("description", f"The {name} field"),
+                default=pget("default"),
+                format=pformat or None,
+                min=pget("minimum"),
+                max=pget("maximum"),
+                min_length=pget("minLength"),
+                max_length=pget("maxLength"),
+            )
+
+            # Handle nested objects
+            if ptype == "object" and "properties" in prop:
+                nested = _cached_fields(prop, read_only)
+                if nested is None:
+                    nested = _new_fields(prop, read_only)
+                    stack.append((prop, nested))
+                field.nested_fields = nested
+
+            # Handle arrays with items
+            elif ptype == "array" and "items" in prop:
+                items = prop["items"]
+                if "$ref" in items:
+                    items = _resolve_property(spec, items)
+                field.elements = map_openapi_type(items.get("type", "string"))
+
+            out.append(field)
 
     return fields
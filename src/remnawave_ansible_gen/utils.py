@@ -1,43 +1,107 @@
 """Utility functions for the Remnawave Ansible Module Generator."""
 
+import os
 import re
+import tomllib
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+# Directories already created by ensure_dir() in this process
+_CREATED_DIRS: set[Path] = set()
 
+# camelCase -> snake_case word boundaries
+_SNAKE1 = re.compile("(.)([A-Z][a-z]+)")
+_SNAKE2 = re.compile("([a-z0-9])([A-Z])")
+
+# OpenAPI type -> Ansible argument spec type
+_OPENAPI_TO_ANSIBLE_TYPE: dict[str, str] = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+    "array": "list",
+    "object": "dict",
+}
+
+
+@lru_cache(maxsize=2048)
 def to_snake_case(name: str) -> str:
     """Convert camelCase or PascalCase to snake_case."""
-    s1 = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
-    return re.sub("([a-z0-9])([A-Z])", r"\1_\2", s1).lower()
+    if name.islower():
+        return name  # No capitals, nothing to split
+    s1 = _SNAKE1.sub(r"\1_\2", name)
+    return _SNAKE2.sub(r"\1_\2", s1).lower()
 
 
+@lru_cache(maxsize=2048)
 def to_camel_case(name: str) -> str:
     """Convert snake_case to camelCase."""
-    components = name.split("_")
-    return components[0] + "".join(x.title() for x in components[1:])
+    # Same result as title-casing each component after the first (matching
+    # to_camel_case in module_utils), done as a single title() over the tail
+    head, _, tail = name.partition("_")
+    return head + tail.title().replace("_", "")
 
 
 def map_openapi_type(openapi_type: str, openapi_format: str | None = None) -> str:
     """Map OpenAPI types to Ansible argument spec types."""
-    type_mapping = {
-        "string": "str",
-        "integer": "int",
-        "number": "float",
-        "boolean": "bool",
-        "array": "list",
-        "object": "dict",
-    }
-    return type_mapping.get(openapi_type, "str")
+    return _OPENAPI_TO_ANSIBLE_TYPE.get(openapi_type, "str")
+
+
+def ensure_dir(path: Path) -> None:
+    """Create a directory (and parents) unless this process already did."""
+    key = path.absolute()
+    if key not in _CREATED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _CREATED_DIRS.add(key)
+
+
+def _write_file(write: tuple[Path, str]) -> None:
+    path, content = write
+    data = content.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return  # Unchanged, keep the existing file and its mtime
+    except FileNotFoundError:
+        pass
+
+    # Write through a raw descriptor, skipping Python's buffered file objects
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def write_files(writes: Iterable[tuple[Path, str]]) -> None:
+    """Write generated files as UTF-8, each with a single write call.
+
+    Files whose content is unchanged are not rewritten. Multiple files are
+    written from a thread pool so their I/O overlaps.
+    """
+    writes = list(writes)
+    if len(writes) <= 1:
+        for write in writes:
+            _write_file(write)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(8, len(writes))) as executor:
+        # Consume the results so write errors propagate
+        list(executor.map(_write_file, writes))
 
 
 def read_pyproject_version(project_root: Path) -> str:
     """Read version from pyproject.toml (source of truth)."""
-    pyproject_path = project_root / "pyproject.toml"
-    content = pyproject_path.read_text()
-    match = re.search(r'^version\s*=\s*"([^"]+)"', content, re.MULTILINE)
-    if not match:
-        raise ValueError("Could not find version in pyproject.toml")
-    return match.group(1)
+    with open(project_root / "pyproject.toml", "rb") as f:
+        pyproject = tomllib.load(f)
+    try:
+        return str(pyproject["project"]["version"])
+    except KeyError:
+        raise ValueError("Could not find version in pyproject.toml") from None
 
 
 def extract_api_version(spec: dict[str, Any]) -> str:
@@ -13,70 +13,114 @@ import sys
 from pathlib import Path
 from typing import Any, cast
 
-import yaml
+from .utils import read_pyproject_version as _read_pyproject_version
+
+_PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Parsed YAML documents keyed by (path, mtime_ns)
+_YAML_CACHE: dict[tuple[str, int], Any] = {}
+
+# Version patterns, compiled once. They match raw bytes so the version files
+# are searched without decoding them.
+_INIT_VER_RE = re.compile(rb'^__version__\s*=\s*"([^"]+)"', re.MULTILINE)
+_INIT_VER_SUB_RE = re.compile(rb'^__version__\s*=\s*"[^"]+"', re.MULTILINE)
+# **Collection version:** 0.1.0 (generated from Remnawave API 2.5.3)
+_README_COLL_RE = re.compile(
+    rb"\*\*Collection version:\*\*\s*(\d+\.\d+\.\d+)(?:\s*\(generated from Remnawave API\s*(\d+\.\d+\.\d+)\))?"
+)
+# version: ">=0.1.0"
+_README_REQ_RE = re.compile(rb'version:\s*">=(\d+\.\d+\.\d+)"')
+# Both README lines in one pattern; groups 1-3 belong to the collection line,
+# groups 4-5 to the requirements line
+_README_SUB_RE = re.compile(
+    rb"(\*\*Collection version:\*\*\s*)\d+\.\d+\.\d+(\s*\(generated from Remnawave API\s*)\d+\.\d+\.\d+(\))"
+    rb'|(version:\s*">=)\d+\.\d+\.\d+(")'
+)
 
 
 def get_project_root() -> Path:
     """Get the project root directory."""
-    return Path(__file__).parent.parent.parent
+    return _PROJECT_ROOT
+
+
+def _load_yaml(path: Path) -> Any:
+    """Parse a YAML file, reusing the result while the file is unchanged."""
+    key = (str(path), path.stat().st_mtime_ns)
+    if key not in _YAML_CACHE:
+        # Imported here so commands that read no YAML don't pay for it
+        import yaml
+
+        # CSafeLoader only exists when PyYAML is built with libyaml
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        with open(path) as f:
+            _YAML_CACHE[key] = yaml.load(f, Loader=loader)
+    return _YAML_CACHE[key]
+
+
+def _load_api_spec() -> dict[str, Any]:
+    """Load the OpenAPI spec through the generator's parsed-spec cache."""
+    from .config import load_openapi_spec
+
+    root = get_project_root()
+    return load_openapi_spec(root / "api-spec" / "api-1.yaml", root / ".cache" / "spec.pkl")
 
 
 def read_pyproject_version() -> str:
     """Read version from pyproject.toml (source of truth)."""
-    pyproject_path = get_project_root() / "pyproject.toml"
-    content = pyproject_path.read_text()
-    match = re.search(r'^version\s*=\s*"([^"]+)"', content, re.MULTILINE)
-    if not match:
-        raise ValueError("Could not find version in pyproject.toml")
-    return match.group(1)
+    return _read_pyproject_version(get_project_root())
 
 
 def read_api_version() -> str:
     """Read Remnawave API version from OpenAPI spec."""
-    spec_path = get_project_root() / "api-spec" / "api-1.yaml"
-    with open(spec_path) as f:
-        spec = cast(dict[str, Any], yaml.safe_load(f))
+    spec = _load_api_spec()
     return str(spec.get("info", {}).get("version", "unknown"))
 
 
 def read_galaxy_version() -> str:
     """Read version from galaxy.yml."""
     galaxy_path = get_project_root() / "ansible_collections" / "ilyagulya" / "remnawave" / "galaxy.yml"
-    with open(galaxy_path) as f:
-        data = cast(dict[str, Any], yaml.safe_load(f))
+    data = cast(dict[str, Any], _load_yaml(galaxy_path))
     return str(data.get("version", "unknown"))
 
 
 def read_init_version() -> str:
     """Read version from __init__.py."""
     init_path = get_project_root() / "src" / "remnawave_ansible_gen" / "__init__.py"
-    content = init_path.read_text()
-    match = re.search(r'^__version__\s*=\s*"([^"]+)"', content, re.MULTILINE)
+    match = _INIT_VER_RE.search(init_path.read_bytes())
     if not match:
         return "unknown"
-    return match.group(1)
+    return match.group(1).decode()
+
+
+def _scan_readme() -> tuple[str, str]:
+    """Read README.md once and return its (collection, requirements) versions."""
+    content = (get_project_root() / "README.md").read_bytes()
+    collection = _README_COLL_RE.search(content)
+    requirements = _README_REQ_RE.search(content)
+    return (
+        collection.group(1).decode() if collection else "unknown",
+        requirements.group(1).decode() if requirements else "unknown",
+    )
+
+
+def _readme_in_sync(pyproject_version: str, api_version: str) -> bool:
+    """Return True if every version line in README.md already matches, i.e. sync would change nothing."""
+    content = (get_project_root() / "README.md").read_bytes()
+    collection = pyproject_version.encode()
+    api = api_version.encode()
+    return all(
+        match.group(1) == collection and match.group(2) == api for match in _README_COLL_RE.finditer(content)
+    ) and all(match.group(1) == collection for match in _README_REQ_RE.finditer(content))
 
 
 def read_readme_collection_version() -> str:
     """Read collection version from README.md."""
-    readme_path = get_project_root() / "README.md"
-    content = readme_path.read_text()
-    # Match: **Collection version:** 0.1.0 (generated from Remnawave API 2.5.3)
-    match = re.search(r"\*\*Collection version:\*\*\s*(\d+\.\d+\.\d+)", content)
-    if not match:
-        return "unknown"
-    return match.group(1)
+    return _scan_readme()[0]
 
 
 def read_readme_requirements_version() -> str:
     """Read requirements version from README.md."""
-    readme_path = get_project_root() / "README.md"
-    content = readme_path.read_text()
-    # Match: version: ">=0.1.0"
-    match = re.search(r'version:\s*">=(\d+\.\d+\.\d+)"', content)
-    if not match:
-        return "unknown"
-    return match.group(1)
+    return _scan_readme()[1]
 
 
 def read_version_info() -> dict[str, Any] | None:
@@ -84,8 +128,7 @@ def read_version_info() -> dict[str, Any] | None:
     version_info_path = get_project_root() / "ansible_collections" / "ilyagulya" / "remnawave" / "meta" / "version_info.yml"
     if not version_info_path.exists():
         return None
-    with open(version_info_path) as f:
-        return cast(dict[str, Any], yaml.safe_load(f))
+    return cast(dict[str, Any], _load_yaml(version_info_path))
 
 
 def show_versions() -> None:
@@ -103,8 +146,9 @@ def show_versions() -> None:
     print("\nDerived Locations:")
     print(f"  galaxy.yml:              {read_galaxy_version()}")
     print(f"  __init__.py:             {read_init_version()}")
-    print(f"  README.md (collection):  {read_readme_collection_version()}")
-    print(f"  README.md (requirements):{read_readme_requirements_version()}")
+    readme_version, readme_req_version = _scan_readme()
+    print(f"  README.md (collection):  {readme_version}")
+    print(f"  README.md (requirements):{readme_req_version}")
 
     version_info = read_version_info()
     if version_info:
@@ -116,35 +160,58 @@ def show_versions() -> None:
         print("\nversion_info.yml: Not found (run 'uv run generate' to create)")
 
 
+def _in_sync(
+    pyproject_version: str,
+    api_version: str,
+    derived_versions: tuple[str, ...],
+    version_info: dict[str, Any] | None,
+) -> bool:
+    """Return True if every derived version and version_info.yml (if any) match the sources of truth."""
+    if any(version != pyproject_version for version in derived_versions):
+        return False
+    return not version_info or (
+        version_info.get("collection_version") == pyproject_version
+        and version_info.get("generator_version") == pyproject_version
+        and version_info.get("remnawave_api_version") == api_version
+    )
+
+
 def check_versions() -> bool:
     """Check if all versions are in sync. Returns True if all are in sync."""
     pyproject_version = read_pyproject_version()
     api_version = read_api_version()
 
+    galaxy_version = read_galaxy_version()
+    init_version = read_init_version()
+    readme_version, readme_req_version = _scan_readme()
+    version_info = read_version_info()
+
+    # Common case: nothing to report
+    derived_versions = (galaxy_version, init_version, readme_version, readme_req_version)
+    if _in_sync(pyproject_version, api_version, derived_versions, version_info):
+        print("Version check PASSED")
+        print(f"  Collection version: {pyproject_version}")
+        print(f"  API version: {api_version}")
+        return True
+
     errors = []
 
     # Check galaxy.yml
-    galaxy_version = read_galaxy_version()
     if galaxy_version != pyproject_version:
         errors.append(f"galaxy.yml: expected {pyproject_version}, got {galaxy_version}")
 
     # Check __init__.py
-    init_version = read_init_version()
     if init_version != pyproject_version:
         errors.append(f"__init__.py: expected {pyproject_version}, got {init_version}")
 
-    # Check README.md collection version
-    readme_version = read_readme_collection_version()
+    # Check README.md collection and requirements versions
     if readme_version != pyproject_version:
         errors.append(f"README.md (collection): expected {pyproject_version}, got {readme_version}")
 
-    # Check README.md requirements version
-    readme_req_version = read_readme_requirements_version()
     if readme_req_version != pyproject_version:
         errors.append(f"README.md (requirements): expected {pyproject_version}, got {readme_req_version}")
 
     # Check version_info.yml if it exists
-    version_info = read_version_info()
     if version_info:
         if version_info.get("collection_version") != pyproject_version:
             errors.append(
@@ -161,19 +228,13 @@ def check_versions() -> bool:
                 f"version_info.yml (api): expected {api_version}, got {version_info.get('remnawave_api_version')}"
             )
 
-    if errors:
-        print("Version check FAILED:")
-        for error in errors:
-            print(f"  - {error}")
-        print(f"\nExpected collection version: {pyproject_version}")
-        print(f"Expected API version: {api_version}")
-        print("\nRun 'uv run version sync' to fix.")
-        return False
-    else:
-        print("Version check PASSED")
-        print(f"  Collection version: {pyproject_version}")
-        print(f"  API version: {api_version}")
-        return True
+    print("Version check FAILED:")
+    for error in errors:
+        print(f"  - {error}")
+    print(f"\nExpected collection version: {pyproject_version}")
+    print(f"Expected API version: {api_version}")
+    print("\nRun 'uv run version sync' to fix.")
+    return False
 
 
 def sync_versions() -> None:
@@ -186,11 +247,20 @@ def sync_versions() -> None:
     print(f"  API version: {api_version}")
     print()
 
+    # Nothing to write on an up-to-date checkout
+    derived_versions = (read_galaxy_version(), read_init_version())
+    in_sync = _in_sync(pyproject_version, api_version, derived_versions, None)
+    if in_sync and _readme_in_sync(pyproject_version, api_version):
+        print("  All versions already in sync")
+        return
+
     # Update galaxy.yml
     galaxy_path = get_project_root() / "ansible_collections" / "ilyagulya" / "remnawave" / "galaxy.yml"
-    with open(galaxy_path) as f:
-        galaxy_data = yaml.safe_load(f)
+    # Copy so the cached document is not modified in place
+    galaxy_data = dict(_load_yaml(galaxy_path))
     if galaxy_data.get("version") != pyproject_version:
+        import yaml
+
         galaxy_data["version"] = pyproject_version
         with open(galaxy_path, "w") as f:
             yaml.dump(galaxy_data, f, default_flow_style=False, sort_keys=False)
@@ -200,36 +270,31 @@ def sync_versions() -> None:
 
     # Update __init__.py
     init_path = get_project_root() / "src" / "remnawave_ansible_gen" / "__init__.py"
-    content = init_path.read_text()
-    new_content = re.sub(
-        r'^__version__\s*=\s*"[^"]+"', f'__version__ = "{pyproject_version}"', content, flags=re.MULTILINE
-    )
+    content = init_path.read_bytes()
+    new_content = _INIT_VER_SUB_RE.sub(f'__version__ = "{pyproject_version}"'.encode(), content)
     if content != new_content:
-        init_path.write_text(new_content)
+        init_path.write_bytes(new_content)
         print("  Updated __init__.py")
     else:
         print("  __init__.py already up to date")
 
     # Update README.md
     readme_path = get_project_root() / "README.md"
-    content = readme_path.read_text()
+    content = readme_path.read_bytes()
 
-    # Update collection version line
-    new_content = re.sub(
-        r"(\*\*Collection version:\*\*\s*)\d+\.\d+\.\d+(\s*\(generated from Remnawave API\s*)\d+\.\d+\.\d+(\))",
-        rf"\g<1>{pyproject_version}\g<2>{api_version}\3",
-        content,
-    )
+    # Update the collection version line and the requirements version in one pass
+    collection = pyproject_version.encode()
+    api = api_version.encode()
 
-    # Update requirements version
-    new_content = re.sub(
-        r'(version:\s*">=)\d+\.\d+\.\d+(")',
-        rf"\g<1>{pyproject_version}\2",
-        new_content,
-    )
+    def replace_readme_version(match: re.Match[bytes]) -> bytes:
+        if match.group(1) is not None:
+            return match.group(1) + collection + match.group(2) + api + match.group(3)
+        return match.group(4) + collection + match.group(5)
+
+    new_content = _README_SUB_RE.sub(replace_readme_version, content)
 
     if content != new_content:
-        readme_path.write_text(new_content)
+        readme_path.write_bytes(new_content)
         print("  Updated README.md")
     else:
         print("  README.md already up to date")